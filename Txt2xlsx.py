@@ -1,17 +1,37 @@
 # -*- coding: utf-8 -*-
 import os
+import io
+import argparse
 import glob
+import numpy as np
 import pandas as pd
 import csv
 import re
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+ENCODINGS = ("utf-8-sig", "utf-8", "cp1252", "latin-1")
+# Dateien ab dieser Größe werden blockweise verarbeitet, statt vollständig in einen DataFrame geladen
+CHUNKED_MIN_FILE_SIZE = 200 * 1024 * 1024
+CHUNKSIZE = 200_000
+# einfache Regex für eine reine numerische Schreibweise (mit Punkt oder Komma)
+SIMPLE_NUMBER_RE = re.compile(r'[+-]?\d+[.,]?\d*')
+# Strings ohne Treffer können von float() nicht geparst werden
+FLOAT_HINT_RE = re.compile(r'\d|inf|nan', re.IGNORECASE)
+# ab dieser Zeilenzahl nutzt find_trim_indices_by_offset den Numba-Scanner (falls numba installiert ist);
+# darunter überwiegt das Laden des kompilierten Scanners aus dem Cache (~0,15 s) den Zeitgewinn
+NUMBA_MIN_ROWS = 250_000
+# Zeichen, an denen str.splitlines trennt ('\r' wird beim Öffnen im Textmodus bereits zu '\n')
+LINE_BREAKS = ('\n', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029')
+CHUNK_READ_SIZE = 1024 * 1024
+# Tabellengrenzen eines Excel-Arbeitsblatts (Zeilen inkl. Kopfzeile)
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_COLS = 16_384
 
 
 def try_read_lines(path):
     """Versuche, die Datei mit mehreren Encodings zu lesen und gebe die Zeilen zurück."""
-    encodings = ("utf-8-sig", "utf-8", "cp1252", "latin-1")
-    for enc in encodings:
+    for enc in ENCODINGS:
         try:
             with open(path, "r", encoding=enc, errors="replace") as f:
                 return f.read().splitlines()
@@ -20,21 +40,64 @@ def try_read_lines(path):
     raise IOError("Datei kann nicht gelesen werden mit bekannten Encodings.")
 
 
+def open_and_find_header(path):
+    """Öffne die Datei mit mehreren Encodings und suche die Kopfzeile zeilenweise.
+
+    Im Gegensatz zu `try_read_lines` wird die Datei nicht vollständig in den Speicher gelesen.
+    Gibt (index, header, delimiter, start_col, f) zurück, wobei f die geöffnete Datei ist, positioniert
+    direkt hinter der Kopfzeile (der Aufrufer muss sie schließen). Wird keine Kopfzeile gefunden,
+    ist die Datei bereits geschlossen und es wird (None, None, None, None, None) zurückgegeben.
+    """
+    for enc in ENCODINGS:
+        try:
+            f = open(path, "r", encoding=enc, errors="replace")
+        except Exception:
+            continue
+        try:
+            header_idx, header, delimiter, start_col = find_header_index(f)
+        except Exception:
+            f.close()
+            continue
+        if header_idx is None:
+            f.close()
+            return None, None, None, None, None
+        return header_idx, header, delimiter, start_col, f
+    raise IOError("Datei kann nicht gelesen werden mit bekannten Encodings.")
+
+
+def _split_line(line, delimiter):
+    """Zerlege eine Zeile am Trennzeichen.
+
+    Zeilen ohne Quotes (der Normalfall bei Tab-getrennten Logger-Dateien) werden mit einem einzigen
+    str.split zerlegt, das dort dasselbe liefert wie csv.reader; nur Zeilen mit Quotes laufen durch
+    das csv-Modul, um eingebettete Trennzeichen korrekt zu behandeln.
+    """
+    if '"' not in line:
+        return line.split(delimiter)
+    try:
+        return next(csv.reader([line], delimiter=delimiter))
+    except Exception:
+        return line.split(delimiter)
+
+
 def find_header_index(lines):
     """Finde den Index der Kopfzeile, in der eines der Felder genau 'Date' ist.
 
+    `lines` kann eine Liste oder ein beliebiges Iterable von Zeilen sein (z.B. eine geöffnete Datei);
+    die Suche bricht bei der Kopfzeile ab, ohne weitere Zeilen zu lesen.
+
     Versucht mehrere mögliche Trennzeichen (Tab, Semikolon, Komma) und verwendet
     das csv-Modul, um korrekt mit Quotes und eingebetteten Kommas umzugehen.
+    Zeilen ohne 'Date' werden per Substring-Test übersprungen (siehe auch `_split_line`).
     Gibt (index, header_list_from_date_onwards, delimiter, start_col) zurück oder (None, None, None, None).
     """
     delimiters = ["\t", ";", ","]
     for i, line in enumerate(lines):
+        # ein Feld 'Date' setzt den Substring voraus -> restliche Zeilen ohne Parsing überspringen
+        if "Date" not in line:
+            continue
         for d in delimiters:
-            try:
-                parts = next(csv.reader([line], delimiter=d))
-            except Exception:
-                parts = [p.strip() for p in line.split(d)]
-            parts = [p.strip() for p in parts]
+            parts = [p.strip() for p in _split_line(line, d)]
             # suche das Feld 'Date' irgendwo in parts
             if "Date" in parts:
                 start_col = parts.index("Date")
@@ -48,28 +111,217 @@ def build_dataframe_from_lines(header, data_lines, delimiter="\t", start_col=0):
 
     Nutzt das übergebene `delimiter` zum Splitten der Zeilen und `start_col`,
     falls die Date-Spalte nicht an Stelle 0 der gesplitteten Zeilen steht.
-    Verwendet das csv-Modul, um korrekt mit Quotes und eingebetteten Delimitern umzugehen.
+    Verwendet das csv-Modul, um korrekt mit Quotes und eingebetteten Delimitern umzugehen
+    (nur für Zeilen mit Quotes, siehe `_split_line`).
     """
-    rows = []
     ncols = len(header)
-    for ln in data_lines:
-        try:
-            parts = next(csv.reader([ln], delimiter=delimiter))
-        except Exception:
-            parts = [p.strip() for p in ln.split(delimiter)]
-        parts = [p.strip() for p in parts]
-        # slice starting at start_col
-        sel = parts[start_col:start_col + ncols] if len(parts) > start_col else [""] * ncols
-        # pad or trim
+    rows = [None] * len(data_lines)
+    for i, ln in enumerate(data_lines):
+        parts = _split_line(ln, delimiter)
+        # slice starting at start_col, nur die ausgewählten Felder strippen
+        sel = [p.strip() for p in parts[start_col:start_col + ncols]]
+        # pad
         if len(sel) < ncols:
-            sel = sel + [""] * (ncols - len(sel))
-        elif len(sel) > ncols:
-            sel = sel[:ncols]
-        rows.append(sel)
+            sel += [""] * (ncols - len(sel))
+        rows[i] = sel
     df = pd.DataFrame(rows, columns=header)
     return df
 
 
+def _read_csv_columns(buf, header, delimiter, start_col, chunksize=None):
+    """Lies alle Zeilen aus `buf` mit dem C-Parser von pandas.read_csv.
+
+    Wählt die Spalten ab `start_col` passend zum Header, liefert alle Zellen als gestrippte Strings
+    (fehlende Felder als ''). Mit `chunksize` wird ein Iterator über Blöcke dieser Form geliefert.
+    Die Spaltenanzahl wird über `names` vorgegeben, damit kurze oder leere erste Datenzeilen den
+    Parser nicht auf zu wenige Spalten festlegen. Fehler des Parsers werden an den Aufrufer weitergereicht.
+    """
+    ncols = len(header)
+    result = pd.read_csv(
+        buf,
+        sep=delimiter,
+        engine="c",
+        header=None,
+        names=range(start_col + ncols),
+        index_col=False,
+        usecols=range(start_col, start_col + ncols),
+        dtype=str,
+        na_filter=False,
+        keep_default_na=False,
+        skip_blank_lines=False,
+        chunksize=chunksize,
+    )
+    if chunksize is None:
+        return _strip_and_label(result, header)
+    return (_strip_and_label(chunk, header) for chunk in result)
+
+
+def _strip_and_label(df, header):
+    """Strippe alle Zellen eines von read_csv gelesenen Blocks und setze die Header-Namen."""
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+    df.columns = header
+    return df
+
+
+def read_dataframe_from_lines(header, data_lines, delimiter="\t", start_col=0):
+    """Erzeuge DataFrame aus Header und data_lines mit dem C-Parser von pandas.read_csv.
+
+    Liefert dasselbe Ergebnis wie `build_dataframe_from_lines` (alle Zellen als gestrippte Strings,
+    fehlende Felder als ''), parst aber in kompiliertem Code statt Zeile für Zeile in Python.
+    Falls der C-Parser die Daten nicht verarbeiten kann (z.B. abweichendes Quoting), wird auf
+    `build_dataframe_from_lines` zurückgefallen.
+    """
+    try:
+        df = _read_csv_columns(io.StringIO("\n".join(data_lines)), header, delimiter, start_col)
+    except Exception:
+        return build_dataframe_from_lines(header, data_lines, delimiter, start_col)
+    if len(df) != len(data_lines):
+        return build_dataframe_from_lines(header, data_lines, delimiter, start_col)
+    return df
+
+
+class _NoDataRowsError(ValueError):
+    """Nach der Kopfzeile folgen keine Datenzeilen (kein Grund für den Fallback)."""
+
+
+class _LineCountingReader:
+    """Dateiähnlicher Wrapper für read_csv, der beim Lesen die Textzeilen zählt.
+
+    Gezählt wird wie bei `str.splitlines` (inkl. '\f', '\x1c' usw.), damit das Ergebnis mit dem
+    zeilenweisen Fallback (`try_read_lines`) vergleichbar ist.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._breaks = 0
+        self._last = ''
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        if data:
+            self._breaks += sum(data.count(c) for c in LINE_BREAKS)
+            self._last = data[-1]
+        return data
+
+    def __iter__(self):
+        return iter(lambda: self.read(CHUNK_READ_SIZE), '')
+
+    @property
+    def line_count(self):
+        """Anzahl der bisher gelesenen Zeilen (eine letzte Zeile ohne Zeilenumbruch zählt mit)."""
+        return self._breaks + (1 if self._last and self._last not in LINE_BREAKS else 0)
+
+
+def read_dataframe_from_file(f, header, delimiter="\t", start_col=0):
+    """Erzeuge DataFrame aus den restlichen Zeilen der geöffneten Datei `f` (ab der aktuellen Position).
+
+    Wie `read_dataframe_from_lines`, aber ohne die Datei vorher als Zeilenliste zu materialisieren.
+    Liefert None, falls der C-Parser die Daten nicht verarbeiten kann oder keine Datenzeilen vorhanden
+    sind; der Aufrufer kann dann auf `try_read_lines` + `read_dataframe_from_lines` zurückfallen.
+    """
+    reader = _LineCountingReader(f)
+    try:
+        df = _read_csv_columns(reader, header, delimiter, start_col)
+    except Exception:
+        return None
+    # gleiche Zeilenaufteilung wie der Fallback (z.B. keine mehrzeiligen Felder in Quotes)
+    if reader.line_count == 0 or len(df) != reader.line_count:
+        return None
+    return df
+
+
+def iter_dataframe_chunks(path, encoding, header_idx, header, delimiter="\t", start_col=0,
+                          columns=None, chunksize=CHUNKSIZE):
+    """Lies die Datenzeilen nach der Kopfzeile blockweise (je `chunksize` Zeilen) als String-DataFrames.
+
+    Öffnet die Datei bei jedem Aufruf neu und überspringt die ersten header_idx + 1 Zeilen, so dass
+    mehrere Durchläufe möglich sind. `columns` wählt optional eine Teilmenge der Header-Spalten aus.
+    Gibt es keine Datenzeilen, wird `_NoDataRowsError` ausgelöst. Weicht die Anzahl der gelesenen Zeilen
+    am Ende von der Anzahl der Textzeilen ab (z.B. mehrzeilige Felder in Quotes), wird ein ValueError
+    ausgelöst, damit der Aufrufer auf den Fallback wechseln kann.
+    """
+    with open(path, "r", encoding=encoding, errors="replace") as f:
+        for _ in range(header_idx + 1):
+            f.readline()
+        reader = _LineCountingReader(f)
+        nrows = 0
+        for chunk in _read_csv_columns(reader, header, delimiter, start_col, chunksize=chunksize):
+            nrows += len(chunk)
+            yield chunk if columns is None else chunk[columns]
+        if reader.line_count == 0:
+            raise _NoDataRowsError("Keine Datenzeilen nach der Kopfzeile gefunden")
+        if nrows != reader.line_count:
+            raise ValueError(f"{nrows} Datenzeilen gelesen, aber {reader.line_count} Textzeilen gefunden")
+
+
+def _scan_nonzero_bounds(chunks, cols):
+    """Bestimme für jede Spalte in `cols` die erste und letzte Zeilenposition mit Wert != 0 über alle Blöcke.
+
+    Liefert dict Spaltenname -> (first, last) bzw. None, falls die Spalte keinen solchen Wert enthält.
+    """
+    bounds = {c: None for c in cols}
+    offset = 0
+    for chunk in chunks:
+        for c in cols:
+            # jeder Block wird über den Scanner geprüft (CHUNKSIZE liegt unter NUMBA_MIN_ROWS)
+            nz = _scan_nonzero_positions(chunk[c])
+            if nz.size:
+                first = bounds[c][0] if bounds[c] else offset + int(nz[0])
+                bounds[c] = (first, offset + int(nz[-1]))
+        offset += len(chunk)
+    return bounds
+
+
+def find_trim_indices_chunked(make_chunks, columns, offset_from_right=2):
+    """Wie `find_trim_indices_by_offset`, aber über Blöcke statt über einen vollständigen DataFrame.
+
+    make_chunks: Funktion ohne Argumente, die einen neuen Iterator über die Blöcke liefert.
+    columns: Spaltennamen der Blöcke.
+    Die relevante Spalte wird in einem Durchlauf gescannt; nur wenn sie keinen Wert != 0 enthält,
+    folgt ein zweiter Durchlauf über die übrigen Spalten (außer 'Date'), von rechts nach links.
+    """
+    if len(columns) < offset_from_right:
+        return None, None, None
+    col = columns[-offset_from_right]
+    bounds = _scan_nonzero_bounds(make_chunks(), [col])
+    if bounds[col]:
+        return bounds[col][0], bounds[col][1], col
+    others = [c for c in columns[::-1] if c != 'Date' and c != col]
+    if not others:
+        return None, None, col
+    bounds = _scan_nonzero_bounds(make_chunks(), others)
+    for c in others:
+        if bounds[c]:
+            return bounds[c][0], bounds[c][1], c
+    return None, None, col
+
+
+def collect_sampled_rows(chunks, columns, start_idx, end_idx, k=1):
+    """Sammle die Zeilen start_idx, start_idx + k, ... (bis einschließlich end_idx) aus den Blöcken.
+
+    Entspricht `df.iloc[start_idx:end_idx + 1].iloc[::k].reset_index(drop=True)` auf dem vollständigen
+    DataFrame, hält aber nur die ausgewählten Zeilen im Speicher.
+    """
+    parts = []
+    offset = 0
+    for chunk in chunks:
+        n = len(chunk)
+        lo = max(start_idx, offset)
+        hi = min(end_idx + 1, offset + n)
+        if lo < hi:
+            # erste Position >= lo im Raster start_idx + m * k
+            first = start_idx + -(-(lo - start_idx) // k) * k
+            if first < hi:
+                parts.append(chunk.iloc[first - offset : hi - offset : k])
+        offset += n
+        if offset > end_idx:
+            break
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)
+
+
 def merge_date_time_if_present(df):
     """Wenn eine Time-Spalte existiert (z.B. 'Time(s)' oder 'Time (s)' o.ä.), entferne sie.
 
@@ -116,18 +368,148 @@ def _normalize_number_str(s) -> str:
 def _to_numeric_series(ser):
     """Versuche, eine Serie von Strings in numerische Werte zu konvertieren nachdem normalisiert wurde.
 
-    Verwende eine List-Comprehension und baue daraus eine pandas.Series, das vermeidet statische Analyzer-Warnungen
-    wenn der Typ von `ser` nicht exakt erkannt wird.
+    Wendet die Regeln von `_normalize_number_str` spaltenweise mit `Series.str`-Operationen an,
+    statt jede Zelle einzeln in Python zu normalisieren. Der Index von `ser` bleibt erhalten.
     """
-    try:
-        arr = [ _normalize_number_str(x) for x in ser.astype(str) ]
-    except Exception:
-        # Fallback: versuche, iterierbar direkt zu verarbeiten
-        arr = [ _normalize_number_str(x) for x in ser ]
-    s = pd.Series(arr)
+    s = ser.astype(str).str.strip()
+    # Tausenderpunkte nur entfernen, wenn mehrere '.' und ein ',' vorkommen
+    thousands = s.str.count(r'\.').gt(1) & s.str.contains(',', regex=False)
+    s = s.mask(thousands, s.str.replace('.', '', regex=False))
+    s = s.str.replace(',', '.', regex=False)
     return pd.to_numeric(s, errors='coerce')
 
 
+def _nonzero_positions(ser_num):
+    """Positionen (nicht Index-Labels, passend für df.iloc) aller Werte != 0 und nicht NaN.
+
+    Prädikat und Indexsuche laufen in einem Durchgang auf dem NumPy-Array statt über boolesche Serien.
+    """
+    arr = ser_num.to_numpy(dtype=float)
+    return np.flatnonzero((arr != 0) & ~np.isnan(arr))
+
+
+def _classify_number_codes(buf, ends):
+    """Klassifiziere Strings für den Trim-Scan.
+
+    buf: Unicode-Codepoints aller Strings hintereinander (uint32), ends: kumulierte Längen
+    (String i endet vor ends[i]).
+
+    Wendet die Regeln von `_normalize_number_str` direkt auf die Zeichen an und liefert je Zeile
+    1 (Zahl != 0), 0 (Zahl == 0 oder nicht numerisch) oder -1 (Schreibweise, die hier nicht sicher
+    entschieden werden kann, z.B. Exponent oder Buchstaben; muss über `_to_numeric_series` geprüft werden).
+    Wird über `_get_number_classifier` mit numba.njit kompiliert, falls numba verfügbar ist.
+    """
+    n = len(ends)
+    out = np.empty(n, dtype=np.int8)
+    start = 0
+    for i in range(n):
+        lo = start
+        hi = ends[i]
+        start = hi
+        while lo < hi and (buf[lo] == 32 or 9 <= buf[lo] <= 13):
+            lo += 1
+        while hi > lo and (buf[hi - 1] == 32 or 9 <= buf[hi - 1] <= 13):
+            hi -= 1
+        dots = 0
+        commas = 0
+        digits = 0
+        nonzero = False
+        unknown = False
+        for j in range(lo, hi):
+            c = buf[j]
+            if 48 <= c <= 57:
+                digits += 1
+                if c != 48:
+                    nonzero = True
+            elif c == 46:
+                dots += 1
+            elif c == 44:
+                commas += 1
+            elif (c == 43 or c == 45) and j == lo:
+                continue
+            else:
+                unknown = True
+                break
+        # sehr lange Ziffernfolgen können beim Parsen über-/unterlaufen -> exakt prüfen lassen
+        if unknown or digits > 15:
+            out[i] = -1
+            continue
+        # Tausenderpunkte werden entfernt, wenn mehrere '.' und ein ',' vorkommen; ',' wird zu '.'
+        seps = commas if (dots > 1 and commas > 0) else dots + commas
+        if seps > 1 or digits == 0:
+            out[i] = 0
+        elif nonzero:
+            out[i] = 1
+        else:
+            out[i] = 0
+    return out
+
+
+# kompilierter Scanner: None = noch nicht geladen, False = numba nicht installiert
+_compiled_classifier = None
+
+
+def _get_number_classifier():
+    """Liefere die mit numba kompilierte `_classify_number_codes` oder None, falls numba fehlt.
+
+    numba wird erst beim ersten Aufruf importiert (der Import kostet spürbar Startzeit und wird nur
+    für sehr große Spalten gebraucht); das Ergebnis wird modulweit gemerkt.
+    """
+    global _compiled_classifier
+    if _compiled_classifier is None:
+        try:
+            import numba
+        except ImportError:
+            # optional: nur für den schnellen Trim-Scan sehr großer Spalten
+            _compiled_classifier = False
+        else:
+            _compiled_classifier = numba.njit(cache=True)(_classify_number_codes)
+    return _compiled_classifier or None
+
+
+def _nonzero_positions_numba(ser, classify):
+    """Wie `_nonzero_positions(_to_numeric_series(ser))`, aber mit einem kompilierten Durchlauf über die Zeichen.
+
+    classify: kompilierte `_classify_number_codes` (siehe `_get_number_classifier`).
+
+    Nur Zeilen, die der Scanner nicht sicher entscheiden kann, werden über `_to_numeric_series` geprüft.
+    """
+    # flacher Puffer + Zeilenenden statt eines Arrays fester Breite: eine einzelne lange Zelle würde
+    # sonst die Breite (und damit den Speicherbedarf) für alle Zeilen bestimmen; NaN zählt wie '' als 0
+    vals = ser.fillna('').astype(str)
+    ends = vals.str.len().to_numpy(dtype=np.int64).cumsum()
+    buf = np.frombuffer(''.join(vals).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    cls = classify(buf, ends)
+    unknown = np.flatnonzero(cls < 0)
+    if unknown.size:
+        ser_num = _to_numeric_series(ser.iloc[unknown])
+        cls[unknown[_nonzero_positions(ser_num)]] = 1
+        cls[cls < 0] = 0
+    return np.flatnonzero(cls == 1)
+
+
+def _scan_nonzero_positions(ser):
+    """Positionen der Werte != 0 in `ser`, mit dem Numba-Scanner, falls numba installiert ist.
+
+    Ohne Zeilen-Schwelle: für Aufrufer, die ohnehin viele Zeilen scannen (z.B. blockweise).
+    """
+    classify = _get_number_classifier()
+    if classify is not None:
+        return _nonzero_positions_numba(ser, classify)
+    return _nonzero_positions(_to_numeric_series(ser))
+
+
+def _column_nonzero_positions(df, col):
+    """Positionen der Werte != 0 in Spalte `col` von `df`.
+
+    Große Spalten werden mit dem Numba-Scanner gescannt, falls numba installiert ist;
+    sonst über `_to_numeric_series` + `_nonzero_positions`.
+    """
+    if len(df) > NUMBA_MIN_ROWS:
+        return _scan_nonzero_positions(df[col])
+    return _nonzero_positions(_to_numeric_series(df[col]))
+
+
 def find_start_index_by_penult_col(df):
     """Kompatibilitäts-Wrapper: wie vorher, verwende die vorletzte Spalte (offset=2).
 
@@ -149,20 +531,16 @@ def find_start_index_by_offset(df, offset_from_right=2):
         penult_col = df.columns[col_idx]
     except Exception:
         return None, None
-    ser_num = _to_numeric_series(df[penult_col])
-    mask = ser_num.notna() & (ser_num != 0)
-    if mask.any():
-        idx = int(mask.idxmax())
-        return idx, penult_col
-    # Fallback: scanne andere Spalten (außer 'Date'), von rechts nach links
+    nz = _column_nonzero_positions(df, penult_col)
+    if nz.size:
+        return int(nz[0]), penult_col
+    # Fallback: scanne andere Spalten (außer 'Date' und der bereits geprüften), von rechts nach links
     for col in df.columns[::-1]:
-        if col == 'Date':
+        if col == 'Date' or col == penult_col:
             continue
-        ser_num = _to_numeric_series(df[col])
-        mask = ser_num.notna() & (ser_num != 0)
-        if mask.any():
-            idx = int(mask.idxmax())
-            return idx, col
+        nz = _column_nonzero_positions(df, col)
+        if nz.size:
+            return int(nz[0]), col
     return None, penult_col
 
 
@@ -177,23 +555,17 @@ def find_last_index_by_offset(df, offset_from_right=2):
         target_col = df.columns[-offset_from_right]
     except Exception:
         return None, None
-    ser_num = _to_numeric_series(df[target_col])
-    mask = ser_num.notna() & (ser_num != 0)
-    if mask.any():
-        # letzter True-Index finden
-        true_indices = list(mask[mask].index)
-        last_idx = int(true_indices[-1])
-        return last_idx, target_col
-    # Fallback: scanne andere Spalten (außer 'Date'), von rechts nach links
+    nz = _column_nonzero_positions(df, target_col)
+    if nz.size:
+        # letzter True-Index (Position) finden
+        return int(nz[-1]), target_col
+    # Fallback: scanne andere Spalten (außer 'Date' und der bereits geprüften), von rechts nach links
     for col in df.columns[::-1]:
-        if col == 'Date':
+        if col == 'Date' or col == target_col:
             continue
-        ser_num = _to_numeric_series(df[col])
-        mask = ser_num.notna() & (ser_num != 0)
-        if mask.any():
-            true_indices = list(mask[mask].index)
-            last_idx = int(true_indices[-1])
-            return last_idx, col
+        nz = _column_nonzero_positions(df, col)
+        if nz.size:
+            return int(nz[-1]), col
     return None, target_col
 
 
@@ -211,25 +583,16 @@ def find_trim_indices_by_offset(df, offset_from_right=2):
         col = df.columns[-offset_from_right]
     except Exception:
         return None, None, None
-    ser_num = _to_numeric_series(df[col])
-    mask = ser_num.notna() & (ser_num != 0)
-    if mask.any():
-        # idxmin/idxmax nicht zuverlässig bei nicht-boolean Indexen -> nutze list
-        true_idxs = list(mask[mask].index)
-        start_idx = int(true_idxs[0])
-        end_idx = int(true_idxs[-1])
-        return start_idx, end_idx, col
-    # Fallback: scanne andere Spalten (außer 'Date'), von rechts nach links
+    nz = _column_nonzero_positions(df, col)
+    if nz.size:
+        return int(nz[0]), int(nz[-1]), col
+    # Fallback: scanne andere Spalten (außer 'Date' und der bereits geprüften), von rechts nach links
     for c in df.columns[::-1]:
-        if c == 'Date':
+        if c == 'Date' or c == col:
             continue
-        ser_num = _to_numeric_series(df[c])
-        mask = ser_num.notna() & (ser_num != 0)
-        if mask.any():
-            true_idxs = list(mask[mask].index)
-            start_idx = int(true_idxs[0])
-            end_idx = int(true_idxs[-1])
-            return start_idx, end_idx, c
+        nz = _column_nonzero_positions(df, c)
+        if nz.size:
+            return int(nz[0]), int(nz[-1]), c
     return None, None, col
 
 
@@ -292,181 +655,370 @@ def get_sampling_k():
         return 1
 
 
+def _german_number_fallback(orig):
+    """Formatiere einen nicht einfach-numerischen String (z.B. '1e5') mit Komma als Dezimaltrennzeichen.
+
+    Liefert `orig` unverändert zurück, falls der Wert nicht als Zahl geparst werden kann.
+    """
+    s = orig.strip()
+    try:
+        f = float(s.replace(',', '.'))
+    except Exception:
+        return orig
+    # Bestimme Dezimalstellen basierend auf Originalstring, falls vorhanden
+    dec = None
+    if '.' in s:
+        dec = len(s.split('.')[-1])
+    elif ',' in s:
+        dec = len(s.split(',')[-1])
+    if dec is not None:
+        fmt = '{:.' + str(dec) + 'f}'
+        return fmt.format(f).replace('.', ',')
+    # Keine Information, schreibe kompaktes Format
+    if f.is_integer():
+        return str(int(f))
+    # verwende repr, aber ersetze '.'->','
+    return str(f).replace('.', ',')
+
+
 def convert_df_numbers_to_german_strings(df, date_cols=('Date',)):
     """Konvertiert numerische Zellen in Strings mit Komma als Dezimaltrennzeichen.
 
     - date_cols: Spaltennamen, die nicht umformatiert werden sollen (z.B. 'Date').
     - Nicht-numerische Zellen bleiben unverändert.
-    - Rückgabe: neuer DataFrame (Kopien der Spalten, numerische Werte als Strings).
+    - Rückgabe: neuer DataFrame (numerische Werte als Strings); `date_cols`-Spalten werden ohne Kopie übernommen.
+
+    Einfache Zahlen, reiner Text und leere Zellen werden spaltenweise mit `Series.str` behandelt; nur die
+    übrigen Zellen (z.B. Exponentialschreibweise) laufen einzeln durch `_german_number_fallback`.
     """
-    df2 = df.copy()
-    # einfache Regex für eine reine numerische Schreibweise (mit Punkt oder Komma)
-    num_re = re.compile(r'^[+-]?\d+[.,]?\d*$')
-    for col in df2.columns:
+    # neue Spalten sammeln statt den ganzen DataFrame vorab zu kopieren
+    new_cols = {}
+    for col in df.columns:
         if col in date_cols:
+            new_cols[col] = df[col]
             continue
-        col_vals = df2[col].astype(str)
-        new_vals = []
-        for orig in col_vals:
-            s = orig.strip()
-            if s == '' or s.lower() in ('nan', 'none'):
-                new_vals.append('')
-                continue
-            # Wenn der Originalstring eine einfache Zahl darstellt (z.B. -15.83 oder 0.00)
-            if num_re.match(s):
-                # Tausenderpunkte entfernen falls vorhanden (z.B. 1.234 -> 1234)
-                # aber nur wenn sowohl '.' und ',' vorkommen oder mehrere Punkte
-                if s.count('.') > 1 and ',' in s:
-                    s2 = s.replace('.', '')
-                else:
-                    s2 = s
-                # Ersetze Dezimalpunkt durch Komma
-                s2 = s2.replace('.', ',')
-                new_vals.append(s2)
-                continue
-            # Falls nicht-matching, versuche numerisch zu parsen und formatiere dann
-            try:
-                f = float(s.replace(',', '.'))
-            except Exception:
-                new_vals.append(orig)
-                continue
-            # Bestimme Dezimalstellen basierend auf Originalstring, falls vorhanden
-            dec = None
-            if '.' in s:
-                dec = len(s.split('.')[-1])
-            elif ',' in s:
-                dec = len(s.split(',')[-1])
-            if dec is not None:
-                fmt = '{:.' + str(dec) + 'f}'
-                formatted = fmt.format(f).replace('.', ',')
-            else:
-                # Keine Information, schreibe kompaktes Format
-                if f.is_integer():
-                    formatted = str(int(f))
-                else:
-                    # verwende repr, aber ersetze '.'->','
-                    formatted = str(f).replace('.', ',')
-            new_vals.append(formatted)
-        df2[col] = new_vals
-    return df2
+        col_vals = df[col].astype(str)
+        s = col_vals.str.strip()
+        empty = s.isna() | (s == '') | s.str.lower().isin(['nan', 'none'])
+        # einfache Zahl (z.B. -15.83 oder 0.00): Dezimalpunkt durch Komma ersetzen
+        simple = s.str.fullmatch(SIMPLE_NUMBER_RE, na=False) & ~empty
+        # Default: Originalwert unverändert übernehmen (gilt u.a. für reinen Text)
+        new_vals = col_vals.astype(object)
+        new_vals[empty] = ''
+        if simple.any():
+            # reine Zahlen als Unicode-Array, Ersetzung in einem Durchgang mit numpy.char
+            new_vals[simple] = np.char.replace(s[simple].to_numpy(dtype=str), '.', ',')
+        # ohne Ziffer (und ohne inf/nan) kann float() nicht parsen -> Originalwert bleibt stehen
+        text = ~(simple | empty) & ~s.str.contains(FLOAT_HINT_RE, na=False)
+        rest = ~(simple | empty | text)
+        if rest.any():
+            new_vals[rest] = col_vals[rest].map(_german_number_fallback)
+        new_cols[col] = new_vals.infer_objects()
+    return pd.DataFrame(new_cols, copy=False)
+
+
+def _max_decimals(arr, max_decimals_cap=6):
+    """Bestimme die maximale Anzahl signifikanter Dezimalstellen eines float-Arrays (bis max_decimals_cap).
+
+    Entspricht dem Formatieren jedes Werts mit max_decimals_cap Nachkommastellen und Abschneiden
+    abschließender Nullen, arbeitet aber vektorisiert auf den auf ganze Zahlen skalierten Werten.
+    Skaliert wird nur der Nachkommaanteil, damit auch große Werte (z.B. Zeitstempel in ms) im
+    exakt darstellbaren Ganzzahlbereich von float64 bleiben.
+
+    >>> _max_decimals(np.array([1697000000123.0, 987654321987.0, 1e17]))
+    0
+    >>> _max_decimals(np.array([1697000000123.5, 0.25]))
+    2
+    >>> _max_decimals(np.array([0.7817205]))
+    6
+    """
+    arr = arr[np.isfinite(arr)]
+    if arr.size == 0:
+        return 0
+    abs_arr = np.abs(arr)
+    frac = abs_arr - np.floor(abs_arr)
+    x = frac * 10.0 ** max_decimals_cap
+    scaled = np.rint(x)
+    # Werte nahe an einem Rundungs-Tie (x.5) rundet np.rint auf dem skalierten float (round half to even),
+    # '{:.6f}' dagegen auf dem exakten Binärwert; diese wenigen Werte daher wie beim Formatieren bestimmen
+    ties = np.flatnonzero(np.abs(x - np.floor(x) - 0.5) < 1e-6)
+    for i in ties:
+        scaled[i] = int(('{:.%df}' % max_decimals_cap).format(frac[i]).replace('.', ''))
+    # Nachkommaanteil, der auf die nächste ganze Zahl aufrundet (z.B. 0.9999999), hat keine Dezimalstellen
+    scaled[scaled == 10.0 ** max_decimals_cap] = 0
+    for dec in range(max_decimals_cap):
+        if not np.fmod(scaled, 10.0 ** (max_decimals_cap - dec)).any():
+            return dec
+    return max_decimals_cap
 
 
 def write_df_to_excel_with_formats(path, df, date_cols=('Date',), max_decimals_cap=6):
     """Schreibe DataFrame nach Excel und setze Number-Format für numerische Spalten.
 
     - Konvertiert alle nicht-`date_cols`-Spalten in numerische Werte (NaN falls nicht konvertierbar).
-    - Schreibt mit pandas.to_excel und öffnet die Datei anschließend mit openpyxl, um die Number-Format-Codes
-      für numerische Zellen zu setzen (Anzahl Dezimalstellen wird aus den Daten bestimmt, begrenzt durch max_decimals_cap).
+    - Bestimmt vorab je numerischer Spalte den Number-Format-Code (Anzahl Dezimalstellen wird aus den Daten
+      bestimmt, begrenzt durch max_decimals_cap) und schreibt die Zellen in einem Durchgang mit xlsxwriter
+      (constant_memory) bzw., falls xlsxwriter nicht installiert ist, mit openpyxl im write_only-Modus.
     - Excel zeigt Dezimaltrennzeichen entsprechend der Benutzer-Regional-Einstellungen (deutsche Excel-Instanz zeigt Komma).
+    - Wirft ValueError, falls die Daten nicht in ein Arbeitsblatt passen (EXCEL_MAX_ROWS / EXCEL_MAX_COLS).
     """
-    df_copy = df.copy()
-    # Konvertiere Spalten in numerisch, wo möglich
-    for col in df_copy.columns:
+    if len(df) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(df)} Datenzeilen überschreiten das Excel-Limit von {EXCEL_MAX_ROWS} Zeilen "
+                         "(inkl. Kopfzeile)")
+    if len(df.columns) > EXCEL_MAX_COLS:
+        raise ValueError(f"{len(df.columns)} Spalten überschreiten das Excel-Limit von {EXCEL_MAX_COLS} Spalten")
+
+    # Konvertiere Spalten in numerisch, wo möglich; neuer DataFrame statt Kopie, Date-Spalten ohne Kopie
+    new_cols = {}
+    for col in df.columns:
         if col in date_cols:
+            new_cols[col] = df[col]
             continue
         try:
-            df_copy[col] = _to_numeric_series(df_copy[col])
+            new_cols[col] = _to_numeric_series(df[col])
         except Exception:
             # falls konvertierung fehlschlägt, belasse Spalte unverändert
-            continue
+            new_cols[col] = df[col]
+    df_copy = pd.DataFrame(new_cols, copy=False)
 
-    # Schreibe zuerst mit pandas (openpyxl engine)
-    with pd.ExcelWriter(path, engine='openpyxl') as writer:
-        df_copy.to_excel(writer, index=False)
-
-    # Öffne mit openpyxl und setze number_format für numerische Spalten
-    wb = load_workbook(path)
-    ws = wb.active
-    nrows = ws.max_row
-
-    for idx, col in enumerate(df_copy.columns, start=1):
+    # Bestimme Number-Format je Spalte (None = kein Format setzen)
+    col_formats = []
+    for col in df_copy.columns:
         header = col
         if header in date_cols:
+            col_formats.append(None)
             continue
         ser = df_copy[header]
         # bestimme, ob Spalte numerisch (mindestens ein numerischer Wert)
         nums = ser.dropna().astype(float)
         if nums.empty:
+            col_formats.append(None)
             continue
         # bestimme maximale Anzahl Dezimalstellen in Daten (bis max_decimals_cap)
-        max_dec = 0
-        for v in nums:
-            if pd.isna(v):
-                continue
-            # arbeite mit String-Repräsentation mit begrenzter Genauigkeit
-            s = ('{:.%df}' % max_decimals_cap).format(v) if False else ('{:.6f}'.format(v))
-            s = s.rstrip('0').rstrip('.')
-            if '.' in s:
-                dec = len(s.split('.')[-1])
-                if dec > max_dec:
-                    max_dec = dec
-            if max_dec >= max_decimals_cap:
-                break
+        max_dec = _max_decimals(nums.to_numpy(), max_decimals_cap)
         # wähle Format
         if max_dec == 0:
             fmt = '0'
         else:
             fmt = '0.' + ('0' * max_dec)
-        col_letter = get_column_letter(idx)
-        # setze number_format für alle numerischen Zellen in der Spalte
-        for row in range(2, nrows + 1):
-            cell = ws[f"{col_letter}{row}"]
-            if isinstance(cell.value, (int, float)):
-                cell.number_format = fmt
+        col_formats.append(fmt)
+
+    # Werte spaltenweise vorbereiten (NaN -> None), damit pro Zelle keine Typprüfung nötig ist
+    columns = list(df_copy.columns)
+    col_values = [df_copy[col].astype(object).where(df_copy[col].notna(), None).tolist()
+                  for col in columns]
+
+    # Bevorzuge xlsxwriter (schnellerer Serializer); falls nicht installiert, openpyxl write_only
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        _write_xlsx_openpyxl(path, columns, col_values, col_formats)
+    else:
+        _write_xlsx_xlsxwriter(path, columns, col_values, col_formats)
+
+
+def _write_xlsx_xlsxwriter(path, columns, col_values, col_formats):
+    """Schreibe Kopfzeile und Spaltenwerte mit xlsxwriter (constant_memory) in einem Durchgang.
+
+    Die Number-Formate werden per `set_column` als Spaltenformat gesetzt und gelten damit für alle
+    geschriebenen Zellen der Spalte; leere Zellen (None) werden nicht geschrieben.
+    """
+    import xlsxwriter
+    wb = xlsxwriter.Workbook(path, {'constant_memory': True, 'use_zip64': True,
+                                    'strings_to_urls': False, 'nan_inf_to_errors': True})
+    try:
+        ws = wb.add_worksheet('Sheet1')
+        # Kopfzeile explizit im Standardformat, damit das Spaltenformat nicht auf sie angewendet wird
+        header_fmt = wb.add_format()
+        for j, fmt in enumerate(col_formats):
+            if fmt is not None:
+                ws.set_column(j, j, None, wb.add_format({'num_format': fmt}))
+        ws.write_row(0, 0, columns, header_fmt)
+        for row_idx, values in enumerate(zip(*col_values), start=1):
+            ws.write_row(row_idx, 0, values)
+    finally:
+        wb.close()
+
+
+def _write_xlsx_openpyxl(path, columns, col_values, col_formats):
+    """Schreibe Kopfzeile und Spaltenwerte mit einem openpyxl-Workbook im write_only-Modus."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title='Sheet1')
+    ws.append(columns)
+    # Eine formatierte Zelle je numerischer Spalte: write_only serialisiert jede Zeile sofort beim
+    # append, daher kann dieselbe Zelle für alle Zeilen der Spalte wiederverwendet werden
+    fmt_cells = []
+    for j, fmt in enumerate(col_formats):
+        if fmt is None:
+            continue
+        cell = WriteOnlyCell(ws)
+        cell.number_format = fmt
+        fmt_cells.append((j, cell))
+    for values in zip(*col_values):
+        row_cells = list(values)
+        for j, cell in fmt_cells:
+            v = values[j]
+            if v is not None:
+                cell.value = v
+                row_cells[j] = cell
+        ws.append(row_cells)
     wb.save(path)
 
 
-def main():
+def trim_and_sample_in_memory(path, f, header_idx, header, delimiter, start_col, offset, k):
+    """Lade die Datenzeilen vollständig, trimme sie anhand der Spalte `offset` und nimm jede k-te Zeile.
+
+    f: geöffnete Datei hinter der Kopfzeile (wird geschlossen).
+    Liefert (out_df, start_idx, end_idx, used_col); out_df ist None, wenn abgebrochen wurde
+    (die Meldung wurde dann bereits ausgegeben).
+    """
+    with f:
+        df = read_dataframe_from_file(f, header, delimiter, start_col)
+
+    if df is None:
+        # Fallback: Datei vollständig lesen und Datenzeilen einzeln verarbeiten
+        try:
+            lines = try_read_lines(path)
+        except Exception as e:
+            print("Fehler beim Lesen der Datei:", e)
+            return None, None, None, None
+        # Kopfzeile in den Zeilen von splitlines erneut suchen: splitlines trennt auch an Zeichen
+        # wie '\f' oder '\x1c', daher kann der beim Iterieren gezählte Index abweichen
+        header_idx, header, delimiter, start_col = find_header_index(lines)
+        if header_idx is None:
+            print("Kopfzeile mit 'Date' nicht gefunden. Abbruch.")
+            return None, None, None, None
+        data_lines = lines[header_idx + 1 :]
+        if not data_lines:
+            print("Keine Datenzeilen nach der Kopfzeile gefunden. Abbruch.")
+            return None, None, None, None
+        df = read_dataframe_from_lines(header, data_lines, delimiter, start_col)
+
+    # Time(s) behandeln: an Date anhängen und entfernen
+    df = merge_date_time_if_present(df)
+
+    if df.empty:
+        print("Keine Daten vorhanden nach Verarbeitung.")
+        return None, None, None, None
+
+    start_idx, end_idx, used_col = find_trim_indices_by_offset(df, offset_from_right=offset)
+    if start_idx is None or end_idx is None:
+        print(f"Kein Wert != 0 in der relevanten Spalte (offset={offset}) gefunden. Abbruch.")
+        return None, None, None, None
+
+    # Trunkieren zwischen start_idx und end_idx (inklusive) und Sampling (jede k-te Zeile)
+    # in einem Schritt über ein einziges Positions-Array
+    out_df = df.take(np.arange(start_idx, end_idx + 1, k)).reset_index(drop=True)
+    return out_df, start_idx, end_idx, used_col
+
+
+def trim_and_sample_chunked(path, encoding, header_idx, header, delimiter, start_col, offset, k):
+    """Wie `trim_and_sample_in_memory`, aber blockweise mit konstantem Speicherbedarf.
+
+    Nur die ausgewählten Ausgabezeilen werden im Speicher gehalten. Liefert (out_df, start_idx, end_idx,
+    used_col); out_df ist None, wenn abgebrochen wurde (die Meldung wurde dann bereits ausgegeben).
+    Lesefehler werden weitergereicht.
+    """
+    # Time-Spalte einmalig anhand der Header-Namen bestimmen statt pro Block
+    columns = list(merge_date_time_if_present(pd.DataFrame(columns=header)).columns)
+
+    def make_chunks():
+        return iter_dataframe_chunks(path, encoding, header_idx, header, delimiter, start_col, columns=columns)
+
+    try:
+        start_idx, end_idx, used_col = find_trim_indices_chunked(make_chunks, columns, offset_from_right=offset)
+    except _NoDataRowsError:
+        print("Keine Datenzeilen nach der Kopfzeile gefunden. Abbruch.")
+        return None, None, None, None
+    if start_idx is None or end_idx is None:
+        print(f"Kein Wert != 0 in der relevanten Spalte (offset={offset}) gefunden. Abbruch.")
+        return None, None, None, used_col
+    # vor dem zweiten Durchlauf prüfen, ob die Auswahl in ein Excel-Arbeitsblatt passt
+    n_out = len(range(start_idx, end_idx + 1, k))
+    if n_out + 1 > EXCEL_MAX_ROWS:
+        print(f"{n_out} ausgewählte Zeilen überschreiten das Excel-Limit von {EXCEL_MAX_ROWS} Zeilen "
+              "(inkl. Kopfzeile); bitte größeres k wählen. Abbruch.")
+        return None, start_idx, end_idx, used_col
+    out_df = collect_sampled_rows(make_chunks(), columns, start_idx, end_idx, k)
+    return out_df, start_idx, end_idx, used_col
+
+
+def _positive_int(value):
+    """argparse-Typ für ganze Zahlen >= 1."""
+    k = int(value)
+    if k < 1:
+        raise argparse.ArgumentTypeError("muss eine ganze Zahl >= 1 sein")
+    return k
+
+
+def parse_args(argv=None):
+    """Kommandozeilen-Argumente für Batch-Läufe ohne GUI-Dialoge."""
+    parser = argparse.ArgumentParser(description="Konvertiert .txt/.csv/.his Dateien nach .xlsx.")
+    parser.add_argument("--path", help="Eingabedatei (ohne Angabe: Datei-Auswahl-Dialog)")
+    parser.add_argument("-k", type=_positive_int, default=None,
+                        help="jeden k-ten Datenpunkt übernehmen (ohne Angabe: Dialog bzw. 1 mit --path)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     print("Starte Konvertierung txt/csv/his -> xlsx")
-    path = get_input_path_from_user()
+    # mit --path werden keine tkinter-Dialoge geöffnet (tkinter wird dann gar nicht geladen)
+    path = args.path if args.path else get_input_path_from_user()
     if not path:
         return
     if not os.path.isfile(path):
         print(f"Datei nicht gefunden: {path}")
         return
 
-    k = get_sampling_k()
+    if args.k is not None:
+        k = args.k
+    elif args.path:
+        k = 1
+    else:
+        k = get_sampling_k()
 
     try:
-        lines = try_read_lines(path)
+        header_idx, header, delimiter, start_col, f = open_and_find_header(path)
     except Exception as e:
         print("Fehler beim Lesen der Datei:", e)
         return
 
-    header_idx, header, delimiter, start_col = find_header_index(lines)
     if header_idx is None:
         print("Kopfzeile mit 'Date' nicht gefunden. Abbruch.")
         return
 
-    data_lines = lines[header_idx + 1 :]
-    if not data_lines:
-        print("Keine Datenzeilen nach der Kopfzeile gefunden. Abbruch.")
-        return
-
-    df = build_dataframe_from_lines(header, data_lines, delimiter, start_col)
-
-    # Time(s) behandeln: an Date anhängen und entfernen
-    df = merge_date_time_if_present(df)
-
-    if df.empty:
-        print("Keine Daten vorhanden nach Verarbeitung.")
-        return
-
     # Bestimme Trim-Indices (Start/Ende) basierend auf Dateityp
     if path.lower().endswith('.his'):
         offset = 4
     else:
         offset = 2
 
-    start_idx, end_idx, used_col = find_trim_indices_by_offset(df, offset_from_right=offset)
-    if start_idx is None or end_idx is None:
-        print(f"Kein Wert != 0 in der relevanten Spalte (offset={offset}) gefunden. Abbruch.")
-        return
+    out_df = None
+    if os.path.getsize(path) >= CHUNKED_MIN_FILE_SIZE:
+        # große Dateien blockweise verarbeiten: ein Durchlauf für die Trim-Indices, einer für das Sampling
+        encoding = f.encoding
+        f.close()
+        try:
+            out_df, start_idx, end_idx, used_col = trim_and_sample_chunked(
+                path, encoding, header_idx, header, delimiter, start_col, offset, k)
+        except Exception as e:
+            # Fallback: Datei neu öffnen und vollständig im Speicher verarbeiten
+            print("Fehler beim blockweisen Lesen der Datei, verarbeite sie vollständig im Speicher:", e)
+            try:
+                header_idx, header, delimiter, start_col, f = open_and_find_header(path)
+            except Exception as e:
+                print("Fehler beim Lesen der Datei:", e)
+                return
+        else:
+            if out_df is None:
+                return
 
-    # Trunkiere die Tabelle zwischen start_idx und end_idx (inklusive)
-    truncated = df.iloc[start_idx : end_idx + 1]
-    # Sampling: jedes k-te Element aus der getrimmten Tabelle
-    out_df = truncated.iloc[::k].reset_index(drop=True)
+    if out_df is None:
+        out_df, start_idx, end_idx, used_col = trim_and_sample_in_memory(
+            path, f, header_idx, header, delimiter, start_col, offset, k)
+        if out_df is None:
+            return
 
     # Ausgabe-Dateiname: gleicher Basisname mit .xlsx
     base = os.path.splitext(os.path.basename(path))[0]